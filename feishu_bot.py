@@ -1,25 +1,55 @@
 """
 飞书自定义机器人消息发送模块
+
+本模块的耗时几乎全部是字符串拼装与 HTTP/LLM 等待，Numba/Cython 之类的编译加速没有收益；
+性能优化应放在 I/O 重叠（连接复用、并发预取 LLM 结果）和 JSON 序列化（orjson）上。
 """
-import hashlib
 import base64
+import functools
 import hmac
 import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import datetime
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from paper import ArxivPaper
 from tqdm import tqdm
 import math
 
 
+# 复用同一个连接池，多张卡片连续发送时保持 keep-alive，避免重复 TLS 握手
+_SESSION = requests.Session()
+_SESSION.headers.update({"Content-Type": "application/json"})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# 飞书自定义机器人限流为 100 次/分钟、5 次/秒，两次发送之间至少间隔 0.6 秒
+_SEND_INTERVAL = 0.6
+_last_send_time = 0.0
+
+
+@functools.lru_cache(maxsize=4)
+def _encoded_secret(secret: str) -> bytes:
+    """缓存签名密钥的 UTF-8 编码，同一次运行中每张卡片都复用"""
+    return secret.encode("utf-8")
+
+
 def gen_sign(timestamp: int, secret: str) -> str:
     """生成签名字符串用于飞书机器人安全校验"""
-    string_to_sign = '{}\n{}'.format(timestamp, secret)
-    hmac_code = hmac.new(string_to_sign.encode("utf-8"), digestmod=hashlib.sha256).digest()
-    sign = base64.b64encode(hmac_code).decode('utf-8')
-    return sign
+    # 飞书的签名方式是以 "timestamp\nsecret" 作为 HMAC 密钥、对空消息做 HmacSHA256
+    string_to_sign = f"{timestamp}\n".encode("ascii") + _encoded_secret(secret)
+    hmac_code = hmac.digest(string_to_sign, b"", "sha256")
+    return base64.b64encode(hmac_code).decode("ascii")
+
+
+# 星级文本查找表：下标为半星数量 (0~10)
+_STAR_TABLE = tuple('⭐' * (n // 2) + ('½' if n % 2 else '') for n in range(11))
 
 
 def get_stars_text(score: float) -> str:
@@ -29,77 +59,59 @@ def get_stars_text(score: float) -> str:
     if score <= low:
         return ''
     elif score >= high:
-        return '⭐⭐⭐⭐⭐'
+        return _STAR_TABLE[10]
     else:
         interval = (high - low) / 10
         star_num = math.ceil((score - low) / interval)
-        full_star_num = int(star_num / 2)
-        half_star_num = star_num - full_star_num * 2
-        return '⭐' * full_star_num + ('½' if half_star_num else '')
+        return _STAR_TABLE[min(star_num, 10)]
 
 
-def build_paper_table(papers: list[ArxivPaper], start_index: int = 1) -> list[dict]:
-    """构建论文表格元素"""
-    if not papers:
-        return []
-    
-    # 表格头
-    header = {
+# 论文表格各列的宽度设置：序号 | 论文标题 | arXiv ID | 论文日期 | 链接
+_TABLE_COLUMNS = (
+    {"tag": "column", "width": "auto"},
+    {"tag": "column", "width": "weighted", "weight": 3},
+    {"tag": "column", "width": "weighted", "weight": 1},
+    {"tag": "column", "width": "auto"},
+    {"tag": "column", "width": "auto"},
+)
+_TABLE_HEADER = ("**序号**", "**论文标题**", "**arXiv ID**", "**论文日期**", "**链接**")
+# 表格中标题的最大展示长度
+_TITLE_LIMIT = 35
+_TITLE_SUFFIX = "..."
+
+
+def _build_table_row(cells: tuple[str, ...], **row_style) -> dict:
+    """按 _TABLE_COLUMNS 的列设置构建一行表格"""
+    return {
         "tag": "column_set",
         "flex_mode": "none",
-        "background_style": "grey",
+        **row_style,
         "columns": [
-            {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": "**序号**"}]},
-            {"tag": "column", "width": "weighted", "weight": 3, "elements": [{"tag": "markdown", "content": "**论文标题**"}]},
-            {"tag": "column", "width": "weighted", "weight": 1, "elements": [{"tag": "markdown", "content": "**arXiv ID**"}]},
-            {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": "**论文日期**"}]},
-            {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": "**链接**"}]},
+            {**column, "elements": [{"tag": "markdown", "content": cell}]}
+            for column, cell in zip(_TABLE_COLUMNS, cells)
         ]
     }
+
+
+def build_paper_table(papers: list[ArxivPaper], start_index: int = 1) -> list[dict]:
+    """构建论文表格元素"""
+    if not papers:
+        return []
     
-    rows = [header]
+    rows = [_build_table_row(_TABLE_HEADER, background_style="grey")]
     
     for i, paper in enumerate(papers, start_index):
         # 截断标题
-        title = paper.title[:35] + "..." if len(paper.title) > 35 else paper.title
-        # 使用 API 返回的发布日期（精确到天）
-        if paper._paper.published:
-            pub_date = paper._paper.published.strftime('%Y-%m-%d')
-        else:
-            # 回退：从 arXiv ID 解析发布年月 (格式: YYMM.NNNNN)
-            try:
-                arxiv_id_prefix = paper.arxiv_id.split('.')[0]
-                year = 2000 + int(arxiv_id_prefix[:2])
-                month = int(arxiv_id_prefix[2:])
-                pub_date = f"{year}-{month:02d}"
-            except (ValueError, IndexError):
-                pub_date = 'N/A'
-        
-        row = {
-            "tag": "column_set",
-            "flex_mode": "none",
-            "columns": [
-                {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": f"{i}"}]},
-                {"tag": "column", "width": "weighted", "weight": 3, "elements": [{"tag": "markdown", "content": title}]},
-                {"tag": "column", "width": "weighted", "weight": 1, "elements": [{"tag": "markdown", "content": paper.arxiv_id}]},
-                {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": pub_date}]},
-                {"tag": "column", "width": "auto", "elements": [{"tag": "markdown", "content": f"[PDF]({paper.pdf_url})"}]},
-            ]
-        }
-        rows.append(row)
+        title = paper.title
+        if len(title) > _TITLE_LIMIT:
+            title = title[:_TITLE_LIMIT] + _TITLE_SUFFIX
+        rows.append(_build_table_row((f"{i}", title, paper.arxiv_id, paper.pub_date, f"[PDF]({paper.pdf_url})")))
     
     return rows
 
 
 def build_paper_detail_element(paper: ArxivPaper, index: int) -> list[dict]:
     """构建单篇论文详细信息元素"""
-    # 处理作者
-    author_list = [a.name for a in paper.authors]
-    if len(author_list) <= 5:
-        authors = ', '.join(author_list)
-    else:
-        authors = ', '.join(author_list[:3] + ['...'] + author_list[-2:])
-    
     elements = [
         {"tag": "hr"},
         {"tag": "markdown", "content": f"**📝 {index}. {paper.title}**"},
@@ -111,14 +123,15 @@ def build_paper_detail_element(paper: ArxivPaper, index: int) -> list[dict]:
         elements.append({"tag": "markdown", "content": f"⭐ 相关度: {stars}"})
     
     # arXiv ID 和链接
-    links = f"[arXiv](https://arxiv.org/abs/{paper.arxiv_id}) | [PDF]({paper.pdf_url})"
+    links = [f"[arXiv](https://arxiv.org/abs/{paper.arxiv_id})", f"[PDF]({paper.pdf_url})"]
     if paper.code_url:
-        links += f" | [Code]({paper.code_url})"
+        links.append(f"[Code]({paper.code_url})")
+    links = " | ".join(links)
     elements.append({"tag": "markdown", "content": f"📎 arXiv ID: {paper.arxiv_id}"})
     elements.append({"tag": "markdown", "content": f"🔗 论文链接: {links}"})
     
     # 作者列表
-    elements.append({"tag": "markdown", "content": f"👥 作者: {authors}"})
+    elements.append({"tag": "markdown", "content": f"👥 作者: {paper.authors_display}"})
     
     # 作者机构
     affiliations = paper.affiliations_from_html
@@ -140,8 +153,46 @@ def build_paper_detail_element(paper: ArxivPaper, index: int) -> list[dict]:
     return elements
 
 
+def _prefetch_paper_detail(paper: ArxivPaper) -> None:
+    """触发 build_paper_detail_element 用到的惰性属性（网络请求 / LLM 调用），结果由 cached_property 缓存"""
+    paper.tldr
+    paper.code_url
+    paper.affiliations_from_html
+    paper.framework_figure
+
+
+_OVERVIEW_TITLE = "📚 ArXiv Today"
+_EMPTY_ELEMENT = {"tag": "markdown", "content": "**今日没有新论文，休息一下吧！** 🎉"}
+
+
+def _build_card(title: str, subtitle: str, template: str, elements: list[dict]) -> dict:
+    """构建 schema 2.0 卡片：带标题/副标题的彩色头部 + 元素列表"""
+    return {
+        "schema": "2.0",
+        "header": {
+            "title": {"tag": "plain_text", "content": title},
+            "subtitle": {"tag": "plain_text", "content": subtitle},
+            "template": template
+        },
+        "body": {
+            "elements": elements
+        }
+    }
+
+
+def _wait_for_send_slot() -> None:
+    """限制发送频率：距上一条消息不足 _SEND_INTERVAL 秒时等待剩余时间"""
+    global _last_send_time
+    wait = _last_send_time + _SEND_INTERVAL - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    _last_send_time = time.monotonic()
+
+
 def _send_card_message(webhook_url: str, card: dict, secret: Optional[str] = None) -> bool:
     """发送单条卡片消息到飞书"""
+    _wait_for_send_slot()
+    
     message = {
         "msg_type": "interactive",
         "card": card
@@ -154,13 +205,8 @@ def _send_card_message(webhook_url: str, card: dict, secret: Optional[str] = Non
         message["sign"] = sign
     
     try:
-        response = requests.post(
-            webhook_url,
-            json=message,
-            headers={"Content-Type": "application/json"},
-            timeout=60
-        )
-        result = response.json()
+        response = _SESSION.post(webhook_url, data=orjson.dumps(message), timeout=30)
+        result = orjson.loads(response.content)
         
         if result.get("code") == 0:
             return True
@@ -192,19 +238,7 @@ def send_feishu_message(
     
     if total == 0:
         # 空消息
-        card = {
-            "schema": "2.0",
-            "header": {
-                "title": {"tag": "plain_text", "content": "📚 ArXiv Today"},
-                "subtitle": {"tag": "plain_text", "content": today},
-                "template": "blue"
-            },
-            "body": {
-                "elements": [
-                    {"tag": "markdown", "content": "**今日没有新论文，休息一下吧！** 🎉"}
-                ]
-            }
-        }
+        card = _build_card(_OVERVIEW_TITLE, today, "blue", [_EMPTY_ELEMENT])
         return _send_card_message(webhook_url, card, secret)
     
     success = True
@@ -234,59 +268,49 @@ def send_feishu_message(
         table_elements = build_paper_table(papers, start_index=1)
         elements.extend(table_elements)
     
-    card = {
-        "schema": "2.0",
-        "header": {
-            "title": {"tag": "plain_text", "content": "📚 ArXiv Today"},
-            "subtitle": {"tag": "plain_text", "content": today},
-            "template": "blue"
-        },
-        "body": {
-            "elements": elements
-        }
-    }
+    card = _build_card(_OVERVIEW_TITLE, today, "blue", elements)
     
     if not _send_card_message(webhook_url, card, secret):
         success = False
     
-    time.sleep(1)  # 发送间隔，避免限流
-    
     # === 后续消息：每个方向的论文详情 ===
     BATCH_SIZE = 5
     
-    for direction_name, papers in grouped_results.items():
-        if not papers:
-            continue
-            
-        for batch_start in range(0, len(papers), BATCH_SIZE):
-            batch_papers = papers[batch_start:batch_start + BATCH_SIZE]
-            batch_num = batch_start // BATCH_SIZE + 1
-            total_batches = (len(papers) + BATCH_SIZE - 1) // BATCH_SIZE
-            
-            elements = []
-            
-            for i, paper in enumerate(tqdm(batch_papers, desc=f'Building {direction_name} details batch {batch_num}')):
-                global_idx = batch_start + i + 1
-                detail_elements = build_paper_detail_element(paper, global_idx)
-                elements.extend(detail_elements)
-                time.sleep(5)  # 等待 LLM 生成
-            
-            card = {
-                "schema": "2.0",
-                "header": {
-                    "title": {"tag": "plain_text", "content": f"📁 {direction_name} - 详情"},
-                    "subtitle": {"tag": "plain_text", "content": f"{today} ({batch_num}/{total_batches})"},
-                    "template": "turquoise"
-                },
-                "body": {
-                    "elements": elements
-                }
-            }
-            
-            if not _send_card_message(webhook_url, card, secret):
-                success = False
-            
-            time.sleep(1)
+    # 一次性提交所有论文的预取任务：后续批次的 LLM 生成与前面批次的发送相互重叠，
+    # 而卡片仍按顺序逐条发送，保证群内消息顺序不乱
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        prefetched = {}
+        for papers in grouped_results.values():
+            for paper in papers:
+                if id(paper) not in prefetched:
+                    prefetched[id(paper)] = executor.submit(_prefetch_paper_detail, paper)
+        
+        for direction_name, papers in grouped_results.items():
+            if not papers:
+                continue
+                
+            for batch_start in range(0, len(papers), BATCH_SIZE):
+                batch_papers = papers[batch_start:batch_start + BATCH_SIZE]
+                batch_num = batch_start // BATCH_SIZE + 1
+                total_batches = (len(papers) + BATCH_SIZE - 1) // BATCH_SIZE
+                
+                elements = []
+                
+                # 单篇论文的批次不值得创建进度条
+                if len(batch_papers) > 1:
+                    batch_iter = tqdm(batch_papers, desc=f'Building {direction_name} details batch {batch_num}')
+                else:
+                    batch_iter = batch_papers
+                for i, paper in enumerate(batch_iter):
+                    prefetched[id(paper)].result()  # 等待该论文预取完成
+                    global_idx = batch_start + i + 1
+                    detail_elements = build_paper_detail_element(paper, global_idx)
+                    elements.extend(detail_elements)
+                
+                card = _build_card(f"📁 {direction_name} - 详情", f"{today} ({batch_num}/{total_batches})", "turquoise", elements)
+                
+                if not _send_card_message(webhook_url, card, secret):
+                    success = False
     
     if success:
         logger.success("飞书消息发送成功！")
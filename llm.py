@@ -2,6 +2,7 @@ from llama_cpp import Llama
 from openai import OpenAI
 from loguru import logger
 from time import sleep
+from threading import Lock
 
 GLOBAL_LLM = None
 
@@ -19,6 +20,8 @@ class LLM:
             )
         self.model = model
         self.lang = lang
+        # 本地 llama.cpp 模型不是线程安全的，并发调用时需要串行化
+        self._local_lock = Lock()
 
     def generate(self, messages: list[dict]) -> str:
         if isinstance(self.llm, OpenAI):
@@ -34,7 +37,8 @@ class LLM:
                     sleep(3)
             return response.choices[0].message.content
         else:
-            response = self.llm.create_chat_completion(messages=messages,temperature=0)
+            with self._local_lock:
+                response = self.llm.create_chat_completion(messages=messages,temperature=0)
             return response["choices"][0]["message"]["content"]
 
 def set_global_llm(api_key: str = None, base_url: str = None, model: str = None, lang: str = "English"):
@@ -27,7 +27,7 @@ from tqdm import trange,tqdm
 from loguru import logger
 from gitignore_parser import parse_gitignore
 from tempfile import mkstemp
-from paper import ArxivPaper
+from paper import ArxivPaper, prefetch, clear_expired_cache, compute_tldrs, compute_affiliations
 from llm import set_global_llm
 import feedparser
 
@@ -356,20 +356,31 @@ if __name__ == '__main__':
 
     # 根据配置选择通知方式
     notify_method = args.notify_method.lower() if args.notify_method else 'feishu'
+    send_feishu = notify_method in ['feishu', 'both'] and bool(args.feishu_webhook_url)
+    send_mail = notify_method in ['email', 'both'] and bool(args.sender and args.receiver)
+
+    if send_feishu or send_mail:
+        clear_expired_cache()
+        # 并发预取两种通知都会用到的源码和代码链接，HTML 机构信息只在飞书卡片中按需获取
+        logger.info("Prefetching recommended papers...")
+        prefetch([p for papers in grouped_results.values() for p in papers])
     
     if notify_method in ['feishu', 'both']:
-        if args.feishu_webhook_url:
+        if send_feishu:
             logger.info("Sending Feishu message...")
             send_feishu_message(args.feishu_webhook_url, grouped_results, args.feishu_secret)
         else:
             logger.warning("Feishu webhook URL not provided, skipping Feishu notification.")
     
     if notify_method in ['email', 'both']:
-        if args.sender and args.receiver:
+        if send_mail:
             # 邮件暂时使用合并的论文列表
             all_papers = []
             for papers in grouped_results.values():
                 all_papers.extend(papers)
+            # 邮件需要 TLDR 和 TeX 中的机构信息，先并发完成这些 LLM 调用
+            compute_tldrs(all_papers)
+            compute_affiliations(all_papers)
             html = render_email(all_papers)
             logger.info("Sending email...")
             send_email(args.sender, args.receiver, args.sender_password, args.smtp_server, args.smtp_port, html)
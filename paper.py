@@ -1,21 +1,166 @@
 from typing import Optional
-from functools import cached_property
+import ast
+import functools
+import os
 from tempfile import TemporaryDirectory
 import arxiv
 import tarfile
 import re
 import time
+from datetime import timedelta
 from llm import get_llm
-import requests
+import requests_cache
 from requests.adapters import HTTPAdapter, Retry
 from loguru import logger
 import tiktoken
 from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
 from urllib.error import HTTPError
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from openai import OpenAI
 
+# 新式 arXiv ID 的年月前缀 (格式: YYMM.NNNNN)
+_RE_ARXIV_ID_YYMM = re.compile(r'(\d{2})(\d{2})\.')
+
+# tex 源文件预处理
+# 单个 tex 文件最多读取 4MB，超过这个大小的基本是自动生成的文件
+_MAX_TEX_BYTES = 4 * 1024 * 1024
+_RE_TEX_COMMENT = re.compile(r'%.*\n')
+_RE_MULTINEWLINE = re.compile(r'\n\n+')  # 只匹配连续多个换行，单个换行无需替换
+_RE_DBLBACKSLASH = re.compile(r'\\\\')
+_RE_SPACES = re.compile(r'[ \t\r\f]{3,}')
+_RE_BEGIN_DOCUMENT = re.compile(r'\\begin\{document\}')
+_RE_END_DOCUMENT = re.compile(r'\\end\{document\}')
+_RE_INPUT_OR_INCLUDE = re.compile(r'\\(?:input|include)\{(.+?)\}')
+
+# 全文解读前清理 tex 中的非正文元素
+_RE_CITE = re.compile(r'~?\\cite.?\{.*?\}')
+_RE_BIBLIOGRAPHY = re.compile(r'\\bibliography\{.*?\}')
+
+# HTML 页面 / LLM 输出解析
+_RE_HTML_BIBLIOGRAPHY_CLASS = re.compile(r'ltx_bibliography|ltx_references')
+_RE_HTML_BLANK_LINES = re.compile(r'\n{3,}')
+_RE_LIST_LITERAL = re.compile(r'\[.*?\]', re.DOTALL)
+_RE_INT = re.compile(r'-?\d+')
+_RE_FRAMEWORK_CAPTION = re.compile(r'\b(overview|architecture|framework|pipeline|the proposed|our model)\b', re.IGNORECASE)
+
+# 解析 arXiv HTML 时只构建需要的子树：作者/机构区域、图片
+# class_ 传列表时要求 class 属性整体相等，多 class 的元素会被漏掉，因此按单个 class 名匹配
+_AFFILIATION_STRAINER = SoupStrainer(class_=re.compile(r'(^|\s)(ltx_authors|authors|ltx_note_content)(\s|$)'))
+_FIGURE_STRAINER = SoupStrainer('figure')
+
+# 所有 arXiv / paperswithcode 请求共用一个连接池，保持 keep-alive 并统一重试策略；
+# 响应（包括 404 这类否定结果）缓存在本地 sqlite 中，跨次运行重复出现的论文无需再次请求。
+# arXiv HTML 页面通常在论文公布后一段时间才生成，因此只缓存 1 天。
+# 缓存文件固定放在程序目录下，不依赖启动时的工作目录
+_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'arxiv_daily.sqlite')
+_SESSION = requests_cache.CachedSession(
+    cache_name=_CACHE_PATH,
+    backend='sqlite',
+    expire_after=timedelta(days=7),
+    urls_expire_after={'arxiv.org/html/*': timedelta(days=1)},
+    allowable_codes=(200, 404),
+)
+_SESSION.headers.update({"User-Agent": "zotero-arxiv-daily"})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+# arXiv 要求同一来源同时只保持一个连接；源码和 HTML 下载串行进行，
+# paperswithcode 与 LLM 调用不受限制，仍然并发
+_ARXIV_SEMAPHORE = BoundedSemaphore(1)
+
+
+@functools.cache
+def _get_encoder() -> tiktoken.Encoding:
+    """gpt-4o 的 tokenizer，首次使用时加载，之后复用"""
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """按 gpt-4o tokenizer 把 text 截断到最多 max_tokens 个 token"""
+    # 每个 token 至少对应一个 UTF-8 字节，字节数不超过上限时一定不需要截断，省去一次完整的 BPE 编码
+    if len(text.encode('utf-8')) <= max_tokens:
+        return text
+    enc = _get_encoder()
+    return enc.decode(enc.encode(text)[:max_tokens])
+
+
+def _read_tex_member(tar: tarfile.TarFile, member: tarfile.TarInfo) -> str:
+    """读取 tar 包中的一个 tex 文件，并去掉注释、多余换行和空格"""
+    if member.size > _MAX_TEX_BYTES:
+        logger.debug(f"{member.name} is larger than {_MAX_TEX_BYTES} bytes, only the beginning is read.")
+    content = tar.extractfile(member).read(_MAX_TEX_BYTES).decode('utf-8',errors='ignore')
+    #remove comments
+    content = _RE_TEX_COMMENT.sub('\n', content)
+    content = _strip_env(content, 'comment')
+    content = _strip_blocks(content, '\\iffalse', '\\fi')
+    #remove redundant \n
+    content = _RE_MULTINEWLINE.sub('\n', content)
+    content = _RE_DBLBACKSLASH.sub('', content)
+    #remove consecutive spaces
+    content = _RE_SPACES.sub(' ', content)
+    return content
+
+
+def _find_block(text: str, begin: str, end: str) -> Optional[str]:
+    """返回 text 中第一个 begin 到其后第一个 end 的片段（含首尾标记），找不到时返回 None
+
+    与 re.search(begin + '.*?' + end, text, flags=re.DOTALL) 结果相同，但只做两次 str.find，不会回溯
+    """
+    start = text.find(begin)
+    if start < 0:
+        return None
+    stop = text.find(end, start + len(begin))
+    if stop < 0:
+        return None
+    return text[start:stop + len(end)]
+
+
+def _strip_blocks(text: str, begin: str, end: str) -> str:
+    """删除 text 中所有从 begin 到其后第一个 end 的片段（含首尾标记）
+
+    与 re.sub(begin + '.*?' + end, '', text, flags=re.DOTALL) 结果相同，但只做线性的 str.find 扫描；
+    正则在存在大量未闭合 begin 时每处都会扫描到文末，退化为平方复杂度。
+    """
+    start = text.find(begin)
+    if start < 0:
+        return text
+    parts = []
+    pos = 0
+    while start >= 0:
+        stop = text.find(end, start + len(begin))
+        if stop < 0:
+            break
+        parts.append(text[pos:start])
+        pos = stop + len(end)
+        start = text.find(begin, pos)
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _strip_env(text: str, env: str) -> str:
+    """删除 text 中所有 \\begin{env}...\\end{env} 环境"""
+    return _strip_blocks(text, f'\\begin{{{env}}}', f'\\end{{{env}}}')
+
+
+class cached_property(functools.cached_property):
+    """不加锁的 cached_property
+
+    Python 3.11 的 functools.cached_property 在计算时持有一把所有实例共享的锁，
+    多线程并发访问不同论文的同一属性（如 tldr）会被完全串行化。
+    这里沿用 Python 3.12 的实现：只按实例缓存，不加锁。
+    """
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance.__dict__
+        if self.attrname not in cache:
+            cache[self.attrname] = self.func(instance)
+        return cache[self.attrname]
 
 
 class ArxivPaper:
@@ -35,10 +180,31 @@ class ArxivPaper:
     def authors(self) -> list[str]:
         return self._paper.authors
     
+    @cached_property
+    def authors_display(self) -> str:
+        """用于展示的作者列表：超过 5 位作者时只保留前 3 位和后 2 位"""
+        author_list = [a.name for a in self.authors]
+        if len(author_list) <= 5:
+            return ', '.join(author_list)
+        return ', '.join(author_list[:3] + ['...'] + author_list[-2:])
+    
     @cached_property
     def arxiv_id(self) -> str:
-        return re.sub(r'v\d+$', '', self._paper.get_short_id())
+        # 去掉版本号后缀，如 2401.12345v2 -> 2401.12345
+        short_id = self._paper.get_short_id()
+        i = short_id.rfind('v')
+        return short_id[:i] if i >= 0 and short_id[i+1:].isdigit() else short_id
     
+    @cached_property
+    def pub_date(self) -> str:
+        """发布日期字符串：优先使用 API 返回的发布日期（精确到天），否则从 arXiv ID 解析年月"""
+        if self._paper.published:
+            return self._paper.published.date().isoformat()
+        m = _RE_ARXIV_ID_YYMM.match(self.arxiv_id)
+        if m is None:
+            return 'N/A'
+        return f"{2000 + int(m.group(1))}-{m.group(2)}"
+
     @property
     def pdf_url(self) -> str:
         if self._paper.pdf_url is not None:
@@ -55,11 +221,8 @@ class ArxivPaper:
     
     @cached_property
     def code_url(self) -> Optional[str]:
-        s = requests.Session()
-        retries = Retry(total=5, backoff_factor=0.1)
-        s.mount('https://', HTTPAdapter(max_retries=retries))
         try:
-            paper_list = s.get(f'https://paperswithcode.com/api/v1/papers/?arxiv_id={self.arxiv_id}').json()
+            paper_list = _SESSION.get(f'https://paperswithcode.com/api/v1/papers/?arxiv_id={self.arxiv_id}', timeout=30).json()
         except Exception as e:
             logger.debug(f'Error when searching {self.arxiv_id}: {e}')
             return None
@@ -69,7 +232,7 @@ class ArxivPaper:
         paper_id = paper_list['results'][0]['id']
 
         try:
-            repo_list = s.get(f'https://paperswithcode.com/api/v1/papers/{paper_id}/repositories/').json()
+            repo_list = _SESSION.get(f'https://paperswithcode.com/api/v1/papers/{paper_id}/repositories/', timeout=30).json()
         except Exception as e:
             logger.debug(f'Error when searching {self.arxiv_id}: {e}')
             return None
@@ -84,7 +247,8 @@ class ArxivPaper:
             # file = self._paper.download_source(dirpath=tmpdirname)
             try:
                 # 尝试下载源文件
-                file = self._paper.download_source(dirpath=tmpdirname)
+                with _ARXIV_SEMAPHORE:
+                    file = self._paper.download_source(dirpath=tmpdirname)
             except HTTPError as e:
                 # 捕获 HTTP 错误 (404=源文件不存在, 403=禁止访问, 503=服务暂不可用 等)
                 logger.warning(f"Source for {self.arxiv_id} not available (HTTP {e.code}). Skipping source analysis.")
@@ -98,12 +262,15 @@ class ArxivPaper:
                 logger.debug(f"Failed to find main tex file of {self.arxiv_id}: Not a tar file.")
                 return None
  
-            tex_files = [f for f in tar.getnames() if f.endswith('.tex')]
+            # 只遍历一次成员列表；按 TarInfo 读取，避免 extractfile(name) 每次线性查找成员
+            members = tar.getmembers()
+            tex_members = {m.name: m for m in members if m.name.endswith('.tex')}
+            bbl_file = [m.name for m in members if m.name.endswith('.bbl')]
+            tex_files = list(tex_members)
             if len(tex_files) == 0:
                 logger.debug(f"Failed to find main tex file of {self.arxiv_id}: No tex file.")
                 return None
             
-            bbl_file = [f for f in tar.getnames() if f.endswith('.bbl')]
             match len(bbl_file) :
                 case 0:
                     if len(tex_files) > 1:
@@ -114,44 +281,35 @@ class ArxivPaper:
                 case 1:
                     main_name = bbl_file[0].replace('.bbl','')
                     main_tex = f"{main_name}.tex"
-                    if main_tex not in tex_files:
+                    if main_tex not in tex_members:
                         logger.debug(f"Cannot find main tex file of {self.arxiv_id} from bbl: The bbl file does not match any tex file.")
                         main_tex = None
                 case _:
                     logger.debug(f"Cannot find main tex file of {self.arxiv_id} from bbl: There are multiple bbl files.")
                     main_tex = None
+            # 按需读取 tex 文件：已知主文件时只读主文件及其引用的子文件
+            file_contents = {}
             if main_tex is None:
                 logger.debug(f"Trying to choose tex file containing the document block as main tex file of {self.arxiv_id}")
-            #read all tex files
-            file_contents = {}
-            for t in tex_files:
-                f = tar.extractfile(t)
-                content = f.read().decode('utf-8',errors='ignore')
-                #remove comments
-                content = re.sub(r'%.*\n', '\n', content)
-                content = re.sub(r'\\begin{comment}.*?\\end{comment}', '', content, flags=re.DOTALL)
-                content = re.sub(r'\\iffalse.*?\\fi', '', content, flags=re.DOTALL)
-                #remove redundant \n
-                content = re.sub(r'\n+', '\n', content)
-                content = re.sub(r'\\\\', '', content)
-                #remove consecutive spaces
-                content = re.sub(r'[ \t\r\f]{3,}', ' ', content)
-                if main_tex is None and re.search(r'\\begin\{document\}', content):
-                    main_tex = t
-                    logger.debug(f"Choose {t} as main tex file of {self.arxiv_id}")
-                file_contents[t] = content
+                for t in tex_files:
+                    file_contents[t] = _read_tex_member(tar, tex_members[t])
+                    if _RE_BEGIN_DOCUMENT.search(file_contents[t]):
+                        main_tex = t
+                        logger.debug(f"Choose {t} as main tex file of {self.arxiv_id}")
+                        break
+            else:
+                file_contents[main_tex] = _read_tex_member(tar, tex_members[main_tex])
             
             if main_tex is not None:
                 main_source:str = file_contents[main_tex]
-                #find and replace all included sub-files
-                include_files = re.findall(r'\\input\{(.+?)\}', main_source) + re.findall(r'\\include\{(.+?)\}', main_source)
-                for f in include_files:
-                    if not f.endswith('.tex'):
-                        file_name = f + '.tex'
-                    else:
-                        file_name = f
-                    main_source = main_source.replace(f'\\input{{{f}}}', file_contents.get(file_name, ''))
-                file_contents["all"] = main_source
+                #find and replace all included sub-files in one pass
+                def _include(m: re.Match) -> str:
+                    f = m.group(1)
+                    file_name = f if f.endswith('.tex') else f + '.tex'
+                    if file_name not in file_contents and file_name in tex_members:
+                        file_contents[file_name] = _read_tex_member(tar, tex_members[file_name])
+                    return file_contents.get(file_name, '')
+                file_contents["all"] = _RE_INPUT_OR_INCLUDE.sub(_include, main_source)
             else:
                 logger.debug(f"Failed to find main tex file of {self.arxiv_id}: No tex file containing the document block.")
                 file_contents["all"] = None
@@ -163,39 +321,48 @@ class ArxivPaper:
             return None
         content = self.tex.get("all")
         if content is None:
-            content = "\n".join(self.tex.values())
+            content = "\n".join(v for k, v in self.tex.items() if k != "all")
         # remove cite
-        content = re.sub(r'~?\\cite.?\{.*?\}', '', content)
+        content = _RE_CITE.sub('', content)
         # remove figure
-        content = re.sub(r'\\begin\{figure\}.*?\\end\{figure\}', '', content, flags=re.DOTALL)
-        content = re.sub(r'\\begin\{figure\*\}.*?\\end\{figure\*\}', '', content, flags=re.DOTALL)
+        content = _strip_env(content, 'figure')
+        content = _strip_env(content, 'figure*')
         # remove table
-        content = re.sub(r'\\begin\{table\}.*?\\end\{table\}', '', content, flags=re.DOTALL)
-        content = re.sub(r'\\begin\{table\*\}.*?\\end\{table\*\}', '', content, flags=re.DOTALL)
+        content = _strip_env(content, 'table')
+        content = _strip_env(content, 'table*')
         # remove bibliography
-        content = re.sub(r'\\begin\{thebibliography\}.*?\\end\{thebibliography\}', '', content, flags=re.DOTALL)
-        content = re.sub(r'\\bibliography\{.*?\}', '', content)
+        content = _strip_env(content, 'thebibliography')
+        content = _RE_BIBLIOGRAPHY.sub('', content)
         # remove preamble (before \begin{document})
-        doc_start = re.search(r'\\begin\{document\}', content)
+        doc_start = _RE_BEGIN_DOCUMENT.search(content)
         if doc_start:
             content = content[doc_start.end():]
         # remove \end{document}
-        content = re.sub(r'\\end\{document\}', '', content)
+        content = _RE_END_DOCUMENT.sub('', content)
         return content.strip()
 
-    def _get_html_content(self) -> Optional[str]:
-        """从 arXiv HTML 页面获取论文纯文本内容，作为 TeX 不可用时的降级方案"""
+    @cached_property
+    def _html_page(self) -> Optional[bytes]:
+        """arXiv HTML 页面原始内容，正文、机构和框架图解析共用一次下载"""
         url = f"https://arxiv.org/html/{self.arxiv_id}"
         try:
-            resp = requests.get(url, timeout=30)
+            with _ARXIV_SEMAPHORE:
+                resp = _SESSION.get(url, timeout=30)
             if resp.status_code != 200:
                 logger.debug(f"HTML version not available for {self.arxiv_id}")
                 return None
         except Exception as e:
             logger.debug(f"Failed to fetch HTML for {self.arxiv_id}: {e}")
             return None
+        return resp.content
+
+    def _get_html_content(self) -> Optional[str]:
+        """从 arXiv HTML 页面获取论文纯文本内容，作为 TeX 不可用时的降级方案"""
+        if self._html_page is None:
+            return None
         
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        # arXiv HTML 固定为 UTF-8，直接指定编码，跳过 BeautifulSoup 对整页的编码探测
+        soup = BeautifulSoup(self._html_page, 'lxml', from_encoding='utf-8')
         
         # 移除不需要的元素
         for tag in soup.find_all(['script', 'style', 'nav', 'header', 'footer']):
@@ -205,7 +372,7 @@ class ArxivPaper:
         for tag in soup.find_all('table'):
             tag.decompose()
         # 移除参考文献部分
-        for tag in soup.find_all(class_=re.compile(r'ltx_bibliography|ltx_references')):
+        for tag in soup.find_all(class_=_RE_HTML_BIBLIOGRAPHY_CLASS):
             tag.decompose()
         
         # 获取主要文章内容
@@ -215,7 +382,7 @@ class ArxivPaper:
         
         text = article.get_text(separator='\n', strip=True)
         # 清理多余空行
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _RE_HTML_BLANK_LINES.sub('\n\n', text)
         
         if len(text) < 100:  # 内容太短，可能不是有效的论文页面
             return None
@@ -225,7 +392,7 @@ class ArxivPaper:
     @cached_property
     def tldr(self) -> str:
         llm = get_llm()
-        enc = tiktoken.encoding_for_model("gpt-4o")
+        enc = _get_encoder()
         is_online_model = isinstance(llm.llm, OpenAI)
         
         # 三级降级策略：TeX全文 → HTML全文 → 摘要翻译
@@ -327,23 +494,22 @@ class ArxivPaper:
     def affiliations(self) -> Optional[list[str]]:
         if self.tex is not None:
             content = self.tex.get("all")
-            if content is None:
-                content = "\n".join(self.tex.values())
-            #search for affiliations
-            possible_regions = [r'\\author.*?\\maketitle',r'\\begin{document}.*?\\begin{abstract}']
-            matches = [re.search(p, content, flags=re.DOTALL) for p in possible_regions]
-            match = next((m for m in matches if m), None)
-            if match:
-                information_region = match.group(0)
+            if content is not None:
+                sources = [content]
             else:
+                # 没有主文件时逐个文件查找，不再拼接整个源码包
+                sources = [v for k, v in self.tex.items() if k != "all"]
+            #search for affiliations
+            possible_regions = [('\\author', '\\maketitle'), ('\\begin{document}', '\\begin{abstract}')]
+            information_region = next(
+                (region for begin, end in possible_regions for src in sources if (region := _find_block(src, begin, end))),
+                None,
+            )
+            if information_region is None:
                 logger.debug(f"Failed to extract affiliations of {self.arxiv_id}: No author information found.")
                 return None
             prompt = f"Given the author information of a paper in latex format, extract the affiliations of the authors in a python list format, which is sorted by the author order. If there is no affiliation found, return an empty list '[]'. Following is the author information:\n{information_region}"
-            # use gpt-4o tokenizer for estimation
-            enc = tiktoken.encoding_for_model("gpt-4o")
-            prompt_tokens = enc.encode(prompt)
-            prompt_tokens = prompt_tokens[:4000]  # truncate to 4000 tokens
-            prompt = enc.decode(prompt_tokens)
+            prompt = _truncate_tokens(prompt, 4000)  # truncate to 4000 tokens
             llm = get_llm()
             affiliations = llm.generate(
                 messages=[
@@ -356,8 +522,8 @@ class ArxivPaper:
             )
 
             try:
-                affiliations = re.search(r'\[.*?\]', affiliations, flags=re.DOTALL).group(0)
-                affiliations = eval(affiliations)
+                affiliations = _RE_LIST_LITERAL.search(affiliations).group(0)
+                affiliations = ast.literal_eval(affiliations)
                 affiliations = list(set(affiliations))
                 affiliations = [str(a) for a in affiliations]
             except Exception as e:
@@ -368,17 +534,10 @@ class ArxivPaper:
     @cached_property
     def affiliations_from_html(self) -> Optional[list[str]]:
         """从 arXiv HTML 页面提取作者机构信息"""
-        url = f"https://arxiv.org/html/{self.arxiv_id}"
-        try:
-            resp = requests.get(url, timeout=30)
-            if resp.status_code != 200:
-                logger.debug(f"HTML version not available for {self.arxiv_id}")
-                return self.affiliations  # 回退到 LaTeX 提取
-        except Exception as e:
-            logger.debug(f"Failed to fetch HTML for {self.arxiv_id}: {e}")
-            return self.affiliations
+        if self._html_page is None:
+            return self.affiliations  # 回退到 LaTeX 提取
         
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = BeautifulSoup(self._html_page, 'lxml', from_encoding='utf-8', parse_only=_AFFILIATION_STRAINER)
         affiliations = []
         
         # 尝试从作者区域提取机构信息
@@ -416,17 +575,11 @@ class ArxivPaper:
     @cached_property
     def framework_figure(self) -> Optional[str]:
         """获取论文框架图 URL（通过解析 arXiv HTML + LLM 选择）"""
-        url = f"https://arxiv.org/html/{self.arxiv_id}"
-        try:
-            resp = requests.get(url, timeout=30)
-            if resp.status_code != 200:
-                logger.debug(f"HTML version not available for {self.arxiv_id}")
-                return None
-        except Exception as e:
-            logger.debug(f"Failed to fetch HTML for {self.arxiv_id}: {e}")
+        if self._html_page is None:
             return None
+        url = f"https://arxiv.org/html/{self.arxiv_id}"
         
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = BeautifulSoup(self._html_page, 'lxml', from_encoding='utf-8', parse_only=_FIGURE_STRAINER)
         figures_info = []
         
         for fig in soup.find_all('figure'):
@@ -446,11 +599,17 @@ class ArxivPaper:
         if len(figures_info) == 1:
             return figures_info[0]['url']
         
+        # 只有一张图的描述带有框架类关键词时直接选用，省去一次 LLM 调用
+        candidates = [fig for fig in figures_info if _RE_FRAMEWORK_CAPTION.search(fig['caption'] or fig['alt'])]
+        if len(candidates) == 1:
+            return candidates[0]['url']
+        
         # 使用 LLM 选择模型框架图
-        prompt = "以下是一篇论文的图片描述列表，请选出最能展示模型框架/架构的那张图，只返回其索引(0-based数字)，如果没有框架图则返回-1:\n"
+        lines = ["以下是一篇论文的图片描述列表，请选出最能展示模型框架/架构的那张图，只返回其索引(0-based数字)，如果没有框架图则返回-1:"]
         for i, fig in enumerate(figures_info):
             caption_text = fig['caption'] or fig['alt'] or '(无描述)'
-            prompt += f"{i}: {caption_text}\n"
+            lines.append(f"{i}: {caption_text}")
+        prompt = "\n".join(lines) + "\n"
         
         llm = get_llm()
         try:
@@ -463,7 +622,7 @@ class ArxivPaper:
                     {"role": "user", "content": prompt},
                 ]
             )
-            idx = int(re.search(r'-?\d+', result).group(0))
+            idx = int(_RE_INT.search(result).group(0))
             if 0 <= idx < len(figures_info):
                 return figures_info[idx]['url']
         except Exception as e:
@@ -471,3 +630,44 @@ class ArxivPaper:
         
         # 回退：返回第一张图
         return figures_info[0]['url']
+
+
+def clear_expired_cache() -> None:
+    """删除本地 HTTP 缓存中已过期的响应
+
+    requests-cache 不会自动清理过期条目，每天都有新论文，不清理的话缓存文件会无限增长。
+    """
+    _SESSION.cache.delete(expired=True)
+
+
+def _map_papers(papers: list[ArxivPaper], fn, workers: int) -> None:
+    """对去重后的论文并发执行 fn"""
+    # 同一篇论文可能出现在多个方向中，只处理一次
+    papers = list({id(p): p for p in papers}.values())
+    if not papers:
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(papers))) as executor:
+        list(executor.map(fn, papers))
+
+
+def prefetch(papers: list[ArxivPaper], workers: int = 8) -> None:
+    """并发预取论文的 TeX 源码和代码链接
+
+    这些属性都是互相独立的网络 I/O，由 cached_property 缓存结果，
+    预取之后渲染邮件/飞书卡片时的访问不再阻塞。
+    """
+    def _fetch(paper: ArxivPaper) -> None:
+        paper.tex
+        paper.code_url
+
+    _map_papers(papers, _fetch, workers)
+
+
+def compute_tldrs(papers: list[ArxivPaper], workers: int = 8) -> None:
+    """并发调用 LLM 生成论文的 TLDR，结果缓存在 paper.tldr 上"""
+    _map_papers(papers, lambda p: p.tldr, workers)
+
+
+def compute_affiliations(papers: list[ArxivPaper], workers: int = 8) -> None:
+    """并发调用 LLM 从 TeX 源码中提取作者机构，结果缓存在 paper.affiliations 上"""
+    _map_papers(papers, lambda p: p.affiliations, workers)